@@ -1,9 +1,11 @@
 from markdown import Extension, Markdown
 from markdown.preprocessors import Preprocessor
+from markdown.treeprocessors import Treeprocessor
 from markdown.blockprocessors import BlockProcessor
 from markdown.blockparser import BlockParser
 from difflib import SequenceMatcher
 import xml.etree.ElementTree as etree
+import json
 import logging
 
 logging.basicConfig(format="%(levelname)s - %(message)s")
@@ -14,10 +16,15 @@ class MainExtension(Extension):
     def __init__(self, **kwargs):
         self.config = {
             "debug": [False, "Debug mode"],
+            "embed_section_index": [
+                False,
+                "Embed the section index into the output HTML as a JSON script element",
+            ],
         }
         super(MainExtension, self).__init__(**kwargs)
 
     def extendMarkdown(self, md: Markdown):
+        self.md = md
         meta: dict = {
             "document": "",
             "document_offsets": [],
@@ -34,6 +41,16 @@ class MainExtension(Extension):
         md.parser.blockprocessors.register(
             OffsetsInjectionBlockProcessor(md.parser, meta), "mark_words", 200
         )  # high priority, usually larger than every other block processor
+        md.treeprocessors.register(
+            SectionIndexTreeprocessor(md, self.getConfig("embed_section_index")),
+            "section_index",
+            4,
+        )  # Lower than toc (5) because we need the heading ids assigned by it
+        md.registerExtension(self)
+        self.reset()
+
+    def reset(self):
+        self.md.section_index = []
 
 
 class CalculateDocumentOffsetPreprocessor(Preprocessor):
@@ -228,3 +245,58 @@ class OffsetsInjectionBlockProcessor(BlockProcessor):
                     "data-offset-accurate-start", str(restored_accurate[0]).lower()
                 )
                 child.set("data-offset-accurate-end", str(restored_accurate[1]).lower())
+
+
+class SectionIndexTreeprocessor(Treeprocessor):
+    """
+    A tree processor to group the offset-injected blocks into sections by headings, so that the comments can be loaded per section
+    """
+
+    HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+    def __init__(self, md: Markdown, embed: bool):
+        super(SectionIndexTreeprocessor, self).__init__(md)
+        self.embed = embed
+
+    def run(self, root: etree.Element):
+        sections: list[dict] = []
+        section = None
+
+        for child in root:
+            start = child.get("data-original-document-start")
+            end = child.get("data-original-document-end")
+            if start is None or end is None:
+                continue
+            block: tuple[int, int] = (int(start), int(end))
+
+            if child.tag in self.HEADING_TAGS:
+                section = {
+                    "id": child.get("id"),
+                    "level": int(child.tag[1]),
+                    "start": block[0],
+                    "end": block[1],
+                    "blocks": [],
+                }
+                sections.append(section)
+            elif section is None:
+                # 第一个标题之前的内容归入一个没有标题的前导段落
+                section = {
+                    "id": None,
+                    "level": 0,
+                    "start": block[0],
+                    "end": block[1],
+                    "blocks": [],
+                }
+                sections.append(section)
+
+            section["end"] = max(section["end"], block[1])
+            section["blocks"].append(block)
+
+        self.md.section_index = sections
+
+        if self.embed:
+            script = etree.SubElement(root, "script")
+            script.set("type", "application/json")
+            script.set("id", "document-section-index")
+            # 转义 "</" 以防止提前闭合 script 标签
+            script.text = json.dumps(sections, ensure_ascii=False).replace("</", "<\\/")
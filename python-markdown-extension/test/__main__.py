@@ -1,3 +1,4 @@
+import json
 import textwrap
 import unittest
 import markdown
@@ -51,8 +52,7 @@ class Tester:
           - pymdownx.tabbed:
               alternate_style: true
         """
-        self.result = markdown.markdown(
-            self.case["document"],
+        self.md = markdown.Markdown(
             extensions=[
                 "document-offsets-injection",
                 "admonition",
@@ -115,6 +115,7 @@ class Tester:
                 },
             },
         )
+        self.result = self.md.convert(self.case["document"])
         self.test_case = test_case
 
     def test(self):
@@ -122,6 +123,12 @@ class Tester:
         tester = ParserTester(self.case, self.test_case)
         tester.feed(self.result)
         tester.check_integrity()
+        if "sections" in self.case:
+            self.test_case.assertEqual(
+                self.md.section_index,
+                self.case["sections"],
+                msg="Section index mismatch",
+            )
 
 
 class ParserTester(HTMLParser):
@@ -216,6 +223,22 @@ class TestParser(unittest.TestCase):
                     "offset": (157, 242),
                 },
             ],
+            "sections": [
+                {
+                    "id": "lorem-ipsum",
+                    "level": 1,
+                    "start": 0,
+                    "end": 132,
+                    "blocks": [(0, 13), (15, 132)],
+                },
+                {
+                    "id": "morbi-neque-lectus",
+                    "level": 2,
+                    "start": 134,
+                    "end": 242,
+                    "blocks": [(134, 155), (157, 242)],
+                },
+            ],
         }
         Tester(case, self).test()
 
@@ -223,6 +246,7 @@ class TestParser(unittest.TestCase):
         case = {
             "document": "",
             "expected": [],
+            "sections": [],
         }
         Tester(case, self).test()
 
@@ -377,9 +401,79 @@ class TestParser(unittest.TestCase):
                     "offset": (1094, 1114),
                 },
             ],
+            "sections": [
+                {
+                    "id": "引入",
+                    "level": 2,
+                    "start": 0,
+                    "end": 117,
+                    "blocks": [(0, 5), (7, 117)],
+                },
+                {
+                    "id": "解释",
+                    "level": 2,
+                    "start": 119,
+                    "end": 1114,
+                    "blocks": [
+                        (119, 124),
+                        (126, 133),
+                        (135, 215),
+                        (217, 239),
+                        (241, 256),
+                        (258, 1092),
+                        (1094, 1114),
+                    ],
+                },
+            ],
         }
         Tester(case, self).test()
 
+    def test_embed_section_index(self):
+        md = markdown.Markdown(
+            extensions=["document-offsets-injection", "toc"],
+            extension_configs={
+                "document-offsets-injection": {
+                    "embed_section_index": True,
+                },
+            },
+        )
+        result = md.convert(
+            textwrap.dedent("""\
+                Lorem ipsum
+
+                # Dolor sit amet
+
+                Consectetur adipiscing elit.""")
+        )
+        self.assertEqual(
+            md.section_index,
+            [
+                {
+                    "id": None,
+                    "level": 0,
+                    "start": 0,
+                    "end": 11,
+                    "blocks": [(0, 11)],
+                },
+                {
+                    "id": "dolor-sit-amet",
+                    "level": 1,
+                    "start": 13,
+                    "end": 59,
+                    "blocks": [(13, 29), (31, 59)],
+                },
+            ],
+        )
+        self.assertIn(
+            '<script id="document-section-index" type="application/json">'
+            + json.dumps(md.section_index, ensure_ascii=False)
+            + "</script>",
+            result,
+        )
+
+        md.reset()
+        self.assertEqual(md.section_index, [])
+
 
 if __name__ == "__main__":
     unittest.main()